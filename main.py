@@ -14,6 +14,14 @@ from icloud_backup.config import Config
 from icloud_backup.extractor import BackupExtractor
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main CLI function"""
     parser = argparse.ArgumentParser(
@@ -39,6 +47,13 @@ def main():
         help="Show detailed progress for each file"
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=positive_int,
+        metavar="N",
+        help="Number of parallel file operations (default: 4x CPU count, max 32)"
+    )
+
     parser.add_argument(
         "--env",
         type=str,
@@ -57,6 +72,9 @@ def main():
             print(f"Configuration error: {error_msg}")
             sys.exit(1)
 
+        if args.jobs is not None:
+            config.io_jobs = args.jobs
+
         # Create extractor and run
         extractor = BackupExtractor(config)
         extractor.run(
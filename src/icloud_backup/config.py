@@ -33,8 +33,11 @@ class Config:
         self.csv_output = os.getenv("CSV_OUTPUT")
 
         # Media file extensions
-        self.media_extensions = {'.heic', '.jpg', '.jpeg', '.png', '.gif',
-                                '.mov', '.mp4', '.m4v', '.avi'}
+        self.media_extensions = frozenset({'.heic', '.jpg', '.jpeg', '.png', '.gif',
+                                           '.mov', '.mp4', '.m4v', '.avi'})
+
+        # Worker threads for file I/O (copying and stat fallbacks are I/O-bound)
+        self.io_jobs = min(32, (os.cpu_count() or 1) * 4)
 
     def validate(self):
         """
@@ -46,11 +49,14 @@ class Config:
         if not self.backup_dir:
             return False, "BACKUP_DIR not set"
 
-        if not os.path.exists(self.backup_dir):
-            return False, f"Backup directory not found: {self.backup_dir}"
-
+        # One stat covers both the backup directory and Manifest.db
         manifest_path = os.path.join(self.backup_dir, "Manifest.db")
-        if not os.path.exists(manifest_path):
+        try:
+            os.stat(manifest_path)
+        except OSError:
+            # Includes PermissionError, which os.path.exists also reports as missing
+            if not os.path.isdir(self.backup_dir):
+                return False, f"Backup directory not found: {self.backup_dir}"
             return False, f"Manifest.db not found in: {self.backup_dir}"
 
         if not self.export_dir:
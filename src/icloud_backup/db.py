@@ -0,0 +1,41 @@
+"""
+SQLite helpers
+Open backup databases read-only with settings tuned for bulk scans
+"""
+
+import sqlite3
+from urllib.parse import quote
+
+# Applied to every connection: backup databases are only ever read
+READ_PRAGMAS = """
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -65536;
+PRAGMA temp_store = MEMORY;
+PRAGMA query_only = 1;
+"""
+
+
+def open_sqlite(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open a backup database read-only
+
+    The database is opened as immutable, so SQLite skips locking and
+    journal handling entirely. Backup files must never be modified.
+    Autocommit mode (isolation_level=None) keeps the sqlite3 module from
+    managing transactions, which only matter for writes.
+
+    Args:
+        path: Path to the SQLite database file
+        check_same_thread: False for connections shared between threads
+            (safe here, the connection never writes)
+
+    Returns:
+        sqlite3.Connection with read pragmas applied
+
+    Raises:
+        sqlite3.OperationalError: If the file cannot be opened
+    """
+    conn = sqlite3.connect(f"file:{quote(path)}?mode=ro&immutable=1", uri=True,
+                           isolation_level=None, check_same_thread=check_same_thread)
+    conn.executescript(READ_PRAGMAS)
+    return conn
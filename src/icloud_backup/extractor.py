@@ -3,15 +3,37 @@ iTunes Backup Media Extractor
 Extract photos and videos from iTunes backup
 """
 
-import sqlite3
 import os
+import sqlite3
 import shutil
 import csv
-from pathlib import Path
+import plistlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+
+from .db import open_sqlite
+from .photos_reader import PhotoColumns, PhotosReader, PhotosSchemaError
+
 
-from .photos_reader import PhotosReader, PhotosSchemaError
+@dataclass(slots=True)
+class MediaFile:
+    """Media file from Manifest.db, with Photos.sqlite metadata if available"""
+
+    file_id: str
+    domain: str
+    relative_path: str
+    file_name: str
+    file_ext: str
+    file_size: Optional[int] = None
+    last_modified: Optional[int] = None
+    capture_date: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    timezone: Optional[str] = None
+    is_favorite: bool = False
 
 
 class BackupExtractor:
@@ -29,92 +51,215 @@ class BackupExtractor:
         self.export_dir = config.export_dir
         self.csv_output = config.csv_output
         self.media_extensions = config.media_extensions
+        self.io_jobs = config.io_jobs
+
+        # Backup hash subdir -> file IDs on disk, see _build_existing_index()
+        self._existing = {}
 
         # Initialize PhotosReader (optional, gracefully fail if not available)
-        self.photos_metadata = {}
+        # Metadata is loaded with the Manifest, for the listed files only
         self.photos_reader = None
         try:
             self.photos_reader = PhotosReader(self.backup_dir)
-            self.photos_metadata = self.photos_reader.get_photo_metadata()
-            print(f"Photos.sqlite loaded: {len(self.photos_metadata)} metadata records found")
         except (FileNotFoundError, PhotosSchemaError) as e:
-            print(f"Warning: Photos.sqlite metadata not available - {str(e)}")
-            print("Continuing without metadata enhancement...")
+            self._warn_no_metadata(e)
+
+    @staticmethod
+    def _warn_no_metadata(error: Exception):
+        """Report that the export continues without Photos.sqlite metadata"""
+        print(f"Warning: Photos.sqlite metadata not available - {str(error)}")
+        print("Continuing without metadata enhancement...")
 
     def get_manifest_db_path(self) -> str:
         """Get path to Manifest.db"""
         return os.path.join(self.backup_dir, "Manifest.db")
 
-    def get_media_files_from_manifest(self) -> List[Dict]:
+    def get_media_files_from_manifest(self, limit: Optional[int] = None) -> List[MediaFile]:
         """
         Extract media file information from Manifest.db
 
+        Photos.sqlite metadata is fetched in one batch for the listed files
+        and merged into the entries.
+
+        Args:
+            limit: Maximum number of files to read (None for all)
+
         Returns:
-            List of dictionaries containing file information
+            List of MediaFile entries
+        """
+        media_files = list(self.iter_media_files(limit))
+
+        if self.photos_reader:
+            # Remove 'Media/' prefix to match Photos.sqlite format
+            asset_keys = {f.relative_path.replace('Media/', '', 1) for f in media_files}
+            try:
+                columns = self.photos_reader.get_photo_metadata_columns(asset_keys)
+                print(f"Photos.sqlite loaded: {len(columns)} metadata records found")
+            except PhotosSchemaError as e:
+                self._warn_no_metadata(e)
+                columns = PhotoColumns()
+            self._merge_photo_metadata(media_files, columns)
+
+        return media_files
+
+    def iter_media_files(self, limit: Optional[int] = None) -> Iterator[MediaFile]:
+        """
+        Stream media file information from Manifest.db
+
+        Rows are read from the cursor in batches, so only the entries
+        kept by the caller stay in memory. Photos.sqlite metadata is not
+        merged here, see get_media_files_from_manifest().
+
+        Args:
+            limit: Maximum number of files to read (None for all), applied
+                in the query so the remaining rows are never fetched
+
+        Yields:
+            MediaFile entry
         """
         manifest_path = self.get_manifest_db_path()
 
-        if not os.path.exists(manifest_path):
+        try:
+            conn = open_sqlite(manifest_path)
+        except sqlite3.OperationalError:
             raise FileNotFoundError(f"Manifest.db not found at {manifest_path}")
 
-        conn = sqlite3.connect(manifest_path)
-        cursor = conn.cursor()
-
-        # Query for files in Media/DCIM/ directory
-        query = """
-        SELECT fileID, domain, relativePath, file
-        FROM Files
-        WHERE relativePath LIKE 'Media/DCIM/%'
-        AND flags = 1
-        """
-
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-        media_files = []
-        for row in rows:
-            file_id, domain, relative_path, file_blob = row
-
-            # Extract file information
-            file_name = os.path.basename(relative_path)
-            file_ext = os.path.splitext(file_name)[1].lower()
-
-            # Only include media files
-            if file_ext in self.media_extensions:
-                file_info = {
-                    'file_id': file_id,
-                    'domain': domain,
-                    'relative_path': relative_path,
-                    'file_name': file_name,
-                    'file_ext': file_ext
-                }
-
-                # Merge Photos.sqlite metadata if available
-                # Remove 'Media/' prefix to match Photos.sqlite format
-                photos_path = relative_path.replace('Media/', '', 1)
-                if photos_path in self.photos_metadata:
-                    metadata = self.photos_metadata[photos_path]
-                    file_info.update({
-                        'capture_date': metadata.get('capture_date'),
-                        'latitude': metadata.get('latitude'),
-                        'longitude': metadata.get('longitude'),
-                        'timezone': metadata.get('timezone'),
-                        'is_favorite': metadata.get('is_favorite', False)
-                    })
-                else:
-                    # No metadata available
-                    file_info.update({
-                        'capture_date': None,
-                        'latitude': None,
-                        'longitude': None,
-                        'timezone': None,
-                        'is_favorite': False
-                    })
-
-                media_files.append(file_info)
-
-        conn.close()
-        return media_files
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+
+            # Query for media files in Media/DCIM/ directory
+            # The range on relativePath ('0' sorts right after '/') can use the
+            # relativePath index ('+flags' keeps the planner off the flags index);
+            # extension matching also happens in SQLite
+            ext_patterns = sorted(f"*{ext}" for ext in self.media_extensions)
+            ext_filter = " OR ".join(["lower(relativePath) GLOB ?"] * len(ext_patterns))
+            query = f"""
+            SELECT fileID, domain, relativePath, file
+            FROM Files
+            WHERE relativePath >= 'Media/DCIM/' AND relativePath < 'Media/DCIM0'
+            AND +flags = 1
+            AND ({ext_filter})
+            LIMIT ?
+            """
+
+            # A negative LIMIT means no limit in SQLite
+            cursor.execute(query, [*ext_patterns, -1 if limit is None else limit])
+
+            # Plain tuples are unpacked straight into MediaFile fields
+            # (no sqlite3.Row or intermediate dict per row)
+            # GLOB also matches dotfiles such as '.heic', which have no
+            # extension; the set check drops them
+            build_file_info = self._build_file_info
+            media_extensions = self.media_extensions
+            while rows := cursor.fetchmany():
+                for file_id, domain, relative_path, file_blob in rows:
+                    media_file = build_file_info(file_id, domain, relative_path, file_blob)
+                    if media_file.file_ext in media_extensions:
+                        yield media_file
+        finally:
+            conn.close()
+
+    @classmethod
+    def _build_file_info(cls, file_id: str, domain: str, relative_path: str,
+                         file_blob: Optional[bytes]) -> MediaFile:
+        """
+        Build file information for one Manifest.db row
+
+        Args:
+            file_id: File ID hash
+            domain: Backup domain
+            relative_path: Path relative to the domain root
+            file_blob: MBFile blob from the 'file' column
+
+        Returns:
+            MediaFile without Photos.sqlite metadata
+        """
+        # Extract file information (str.rpartition is much cheaper than
+        # os.path.basename/splitext for Manifest paths, which always use '/')
+        file_name = relative_path.rpartition('/')[2]
+        stem, _, ext = file_name.rpartition('.')
+        # Leading dots belong to the name, as in os.path.splitext ('.heic')
+        file_ext = f".{ext.lower()}" if stem.lstrip('.') else ''
+
+        # Size and mtime (Unix seconds) are recorded in the Manifest,
+        # no need to stat the blob
+        file_properties = cls._decode_file_blob(file_blob)
+
+        return MediaFile(
+            file_id, domain, relative_path, file_name, file_ext,
+            file_properties.get('Size'), file_properties.get('LastModified')
+        )
+
+    @staticmethod
+    def _merge_photo_metadata(media_files: List[MediaFile], columns: PhotoColumns):
+        """
+        Merge loaded Photos.sqlite metadata into media files
+
+        Files without a metadata record keep their None/False defaults.
+
+        Args:
+            media_files: Media files to update in place
+            columns: Metadata from PhotosReader.get_photo_metadata_columns()
+        """
+        coordinate = PhotoColumns.coordinate
+        rows = columns.index()
+        for media_file in media_files:
+            # Remove 'Media/' prefix to match Photos.sqlite format
+            i = rows.get(media_file.relative_path.replace('Media/', '', 1))
+            if i is not None:
+                media_file.capture_date = columns.capture_date[i]
+                media_file.latitude = coordinate(columns.latitude[i])
+                media_file.longitude = coordinate(columns.longitude[i])
+                media_file.timezone = columns.timezone[i]
+                media_file.is_favorite = bool(columns.is_favorite[i])
+
+    @staticmethod
+    def _decode_file_blob(file_blob: Optional[bytes]) -> Dict:
+        """
+        Decode the NSKeyedArchiver MBFile blob stored in the Files table
+
+        Args:
+            file_blob: Value of the 'file' column from Manifest.db
+
+        Returns:
+            MBFile properties (Size, LastModified, ...), empty dict if undecodable
+        """
+        if not file_blob:
+            return {}
+
+        try:
+            archive = plistlib.loads(file_blob)
+            properties = archive['$objects'][archive['$top']['root'].data]
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+            return {}
+
+        return properties if isinstance(properties, dict) else {}
+
+    def _build_existing_index(self, subdirs: Iterable[str]):
+        """
+        Record which file IDs exist, with one scandir per hash subdirectory
+
+        Listings are cached in self._existing (subdir -> set of names), so
+        each subdirectory is read at most once per extractor.
+
+        Args:
+            subdirs: 2-character subdirectory names to list
+        """
+        for subdir in subdirs:
+            if subdir in self._existing:
+                continue
+            try:
+                with os.scandir(os.path.join(self.backup_dir, subdir)) as entries:
+                    self._existing[subdir] = {entry.name for entry in entries}
+            except OSError:
+                # Unreadable subdirectories (e.g. PermissionError) count as
+                # empty, as os.path.exists reports their files as missing
+                self._existing[subdir] = set()
+
+    def _in_backup(self, file_id: str) -> bool:
+        """Check a file ID against the listings from _build_existing_index()"""
+        return file_id in self._existing.get(file_id[:2], ())
 
     def get_backup_file_path(self, file_id: str) -> Optional[str]:
         """
@@ -131,11 +276,13 @@ class BackupExtractor:
 
         # File ID is stored as XX/YYYYYYYY... where XX is first 2 chars
         subdir = file_id[:2]
-        file_path = os.path.join(self.backup_dir, subdir, file_id)
+        self._build_existing_index((subdir,))
+        if not self._in_backup(file_id):
+            return None
 
-        return file_path if os.path.exists(file_path) else None
+        return os.path.join(self.backup_dir, subdir, file_id)
 
-    def get_statistics(self, media_files: List[Dict]) -> Dict:
+    def get_statistics(self, media_files: List[MediaFile]) -> Dict:
         """
         Calculate statistics about media files
 
@@ -145,38 +292,104 @@ class BackupExtractor:
         Returns:
             Dictionary with statistics
         """
-        stats = {
-            'total_count': len(media_files),
-            'by_extension': {},
-            'total_size': 0,
-            'missing_files': 0,
-            'with_metadata': 0,
-            'with_gps': 0,
-            'favorites': 0
-        }
+        self._build_existing_index(self._backup_subdirs(media_files))
+        self._fill_missing_sizes(media_files)
+        return self._count_files(media_files)
 
+    def _count_files(self, media_files: List[MediaFile]) -> Dict:
+        """
+        Count media files in one pass
+
+        The existence index and missing sizes must already be filled in
+        (_build_existing_index(), _fill_missing_sizes()).
+
+        Args:
+            media_files: List of media file information
+
+        Returns:
+            Dictionary with statistics
+        """
+        by_extension = Counter()
+        total_size = missing_files = with_metadata = with_gps = favorites = 0
+
+        # Local aliases keep attribute lookups out of the loop
+        existing = self._existing.get
         for file_info in media_files:
-            ext = file_info['file_ext']
-            stats['by_extension'][ext] = stats['by_extension'].get(ext, 0) + 1
+            by_extension[file_info.file_ext] += 1
 
-            # Check if file exists and get size
-            file_path = self.get_backup_file_path(file_info['file_id'])
-            if file_path:
-                stats['total_size'] += os.path.getsize(file_path)
+            file_id = file_info.file_id
+            if file_id in existing(file_id[:2], ()):
+                total_size += file_info.file_size
             else:
-                stats['missing_files'] += 1
+                missing_files += 1
 
             # Metadata statistics
-            if file_info.get('capture_date'):
-                stats['with_metadata'] += 1
-            if file_info.get('latitude') is not None:
-                stats['with_gps'] += 1
-            if file_info.get('is_favorite'):
-                stats['favorites'] += 1
+            if file_info.capture_date:
+                with_metadata += 1
+            if file_info.latitude is not None:
+                with_gps += 1
+            if file_info.is_favorite:
+                favorites += 1
+
+        return {
+            'total_count': len(media_files),
+            'by_extension': dict(by_extension),
+            'total_size': total_size,
+            'missing_files': missing_files,
+            'with_metadata': with_metadata,
+            'with_gps': with_gps,
+            'favorites': favorites
+        }
+
+    def _fill_missing_sizes(self, media_files: List[MediaFile]):
+        """
+        Stat files whose size is not recorded in Manifest.db, in parallel
+
+        Sizes are stored in file_info.file_size, so later steps reuse them.
 
-        return stats
+        Args:
+            media_files: List of media file information
+        """
+        unsized = [f for f in media_files
+                   if f.file_size is None and self._in_backup(f.file_id)]
+        if not unsized:
+            return
+
+        paths = [os.path.join(self.backup_dir, f.file_id[:2], f.file_id)
+                 for f in unsized]
+        with ThreadPoolExecutor(max_workers=max(1, self.io_jobs)) as executor:
+            for file_info, file_size in zip(unsized, executor.map(os.path.getsize, paths)):
+                file_info.file_size = file_size
+
+    @staticmethod
+    def _backup_subdirs(media_files: List[MediaFile]) -> set:
+        """Hash subdirectories holding the given files"""
+        return {f.file_id[:2] for f in media_files if len(f.file_id) >= 2}
+
+    def print_statistics(self, stats: Dict):
+        """
+        Print statistics summary
 
-    def export_files(self, media_files: List[Dict],
+        Args:
+            stats: Dictionary from get_statistics()
+        """
+        print(f"Statistics:")
+        print(f"  Total files: {stats['total_count']}")
+        print(f"  Total size: {stats['total_size']:,} bytes ({stats['total_size'] / 1024 / 1024:.2f} MB)")
+        print(f"  By extension:")
+        for ext, count in sorted(stats['by_extension'].items()):
+            print(f"    {ext}: {count}")
+        if stats['missing_files'] > 0:
+            print(f"  Missing files: {stats['missing_files']}")
+
+        # Metadata statistics
+        if self.photos_reader:
+            print(f"\nMetadata statistics:")
+            print(f"  Files with capture date: {stats['with_metadata']}")
+            print(f"  Files with GPS data: {stats['with_gps']}")
+            print(f"  Favorite files: {stats['favorites']}")
+
+    def export_files(self, media_files: List[MediaFile],
                     dry_run: bool = False,
                     limit: Optional[int] = None,
                     verbose: bool = False) -> List[Dict]:
@@ -195,11 +408,25 @@ class BackupExtractor:
         if not dry_run:
             os.makedirs(self.export_dir, exist_ok=True)
 
-        exported_files = []
         total = len(media_files) if limit is None else min(limit, len(media_files))
         files_to_process = media_files[:limit] if limit else media_files
+        self._print_export_header(len(media_files), total, limit, dry_run)
+
+        self._build_existing_index(self._backup_subdirs(files_to_process))
 
-        print(f"Found {len(media_files)} media files")
+        # Plan destinations serially so the copy phase needs no locking
+        tasks = []
+        taken_names = {}
+        for idx, file_info in enumerate(files_to_process, 1):
+            exists = self._in_backup(file_info.file_id)
+            tasks.append(self._plan_export(idx, file_info, exists, dry_run, taken_names))
+
+        return self._run_exports(tasks, total, dry_run, verbose)
+
+    def _print_export_header(self, count: int, total: int, limit: Optional[int],
+                             dry_run: bool):
+        """Print the summary shown before exporting"""
+        print(f"Found {count} media files")
         if limit:
             print(f"Processing first {total} files (limit applied)")
         if dry_run:
@@ -207,90 +434,205 @@ class BackupExtractor:
         print(f"Export directory: {self.export_dir}")
         print("-" * 60)
 
-        for idx, file_info in enumerate(files_to_process, 1):
-            file_id = file_info['file_id']
-            file_name = file_info['file_name']
-            relative_path = file_info['relative_path']
+    def _plan_export(self, idx: int, file_info: MediaFile, exists: bool, dry_run: bool,
+                     taken_names: Dict[str, set]) -> Tuple:
+        """
+        Choose source and destination paths for one file
 
-            # Get source file path
-            source_path = self.get_backup_file_path(file_id)
+        Args:
+            idx: 1-based position of the file, used in progress messages
+            file_info: Media file information
+            exists: Whether the file is present in backup directory
+            dry_run: If True, don't create directories or resolve duplicates
+            taken_names: dest_subdir -> lowercased names on disk or planned,
+                updated with the chosen name
 
-            if not source_path:
-                if verbose:
-                    print(f"[{idx}/{total}] SKIP: {file_name} (file not found)")
-                continue
+        Returns:
+            Tuple of (idx, file_info, source_path, dest_path); paths are None
+            when the file is missing from backup
+        """
+        if not exists:
+            return idx, file_info, None, None
+
+        file_id = file_info.file_id
+        file_name = file_info.file_name
+        relative_path = file_info.relative_path
 
-            # Create destination path (preserve DCIM folder structure)
-            path_parts = Path(relative_path).parts[2:]  # Skip 'Media/DCIM/'
-            dest_subdir = os.path.join(self.export_dir, *path_parts[:-1]) if len(path_parts) > 1 else self.export_dir
+        # Get source file path
+        source_path = os.path.join(self.backup_dir, file_id[:2], file_id)
 
+        # Create destination path (preserve DCIM folder structure)
+        # (Manifest paths always use '/', no Path object needed per file)
+        path_parts = relative_path.split('/')[2:]  # Skip 'Media/DCIM/'
+        dest_subdir = os.path.join(self.export_dir, *path_parts[:-1]) if len(path_parts) > 1 else self.export_dir
+
+        # Create and list each destination directory once
+        if dest_subdir not in taken_names:
+            taken_names[dest_subdir] = set()
             if not dry_run:
                 os.makedirs(dest_subdir, exist_ok=True)
+                with os.scandir(dest_subdir) as entries:
+                    taken_names[dest_subdir].update(entry.name.lower() for entry in entries)
+        taken = taken_names[dest_subdir]
+
+        # Handle duplicate filenames (compared case-insensitively, as on
+        # NTFS/APFS export targets)
+        dest_name = file_name
+        counter = 1
+        while not dry_run and dest_name.lower() in taken:
+            name, ext = os.path.splitext(file_name)
+            dest_name = f"{name}_{counter}{ext}"
+            counter += 1
+        taken.add(dest_name.lower())
+
+        return idx, file_info, source_path, os.path.join(dest_subdir, dest_name)
+
+    def _run_exports(self, tasks: List[Tuple], total: int, dry_run: bool,
+                     verbose: bool) -> List[Dict]:
+        """
+        Copy planned files in parallel, collecting results in plan order
 
-            dest_path = os.path.join(dest_subdir, file_name)
+        Args:
+            tasks: Tuples from _plan_export()
+            total: Number of files being processed, used in progress messages
+            dry_run: If True, don't actually copy files
+            verbose: If True, print detailed progress
 
-            # Handle duplicate filenames
-            counter = 1
-            while not dry_run and os.path.exists(dest_path):
-                name, ext = os.path.splitext(file_name)
-                dest_path = os.path.join(dest_subdir, f"{name}_{counter}{ext}")
-                counter += 1
+        Returns:
+            List of exported file information
+        """
+        exported_files = []
 
-            # Copy file or simulate
-            try:
-                file_size = os.path.getsize(source_path)
-
-                if not dry_run:
-                    shutil.copy2(source_path, dest_path)
-                    mod_time = datetime.fromtimestamp(os.path.getmtime(dest_path))
-                else:
-                    mod_time = datetime.fromtimestamp(os.path.getmtime(source_path))
-
-                export_info = {
-                    'original_path': relative_path,
-                    'file_name': file_name,
-                    'file_size': file_size,
-                    'modified_time': mod_time.isoformat(),
-                    'export_path': dest_path,
-                    'capture_date': file_info.get('capture_date', ''),
-                    'latitude': file_info.get('latitude', ''),
-                    'longitude': file_info.get('longitude', ''),
-                    'timezone': file_info.get('timezone', ''),
-                    'is_favorite': file_info.get('is_favorite', False)
-                }
+        max_workers = 1 if dry_run else max(1, self.io_jobs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._export_file, file_info, source_path, dest_path, dry_run)
+                if source_path else None
+                for _, file_info, source_path, dest_path in tasks
+            ]
+
+            for (idx, file_info, _, _), future in zip(tasks, futures):
+                file_name = file_info.file_name
+                if future is None:
+                    if verbose:
+                        print(f"[{idx}/{total}] SKIP: {file_name} (file not found)")
+                    continue
+
+                try:
+                    export_info = future.result()
+                except Exception as e:
+                    print(f"[{idx}/{total}] ERROR: {file_name} - {str(e)}")
+                    continue
 
                 exported_files.append(export_info)
 
                 if verbose:
                     mode = "[DRY RUN]" if dry_run else "[OK]"
-                    print(f"[{idx}/{total}] {mode}: {file_name} ({file_size:,} bytes)")
-
-            except Exception as e:
-                print(f"[{idx}/{total}] ERROR: {file_name} - {str(e)}")
+                    print(f"[{idx}/{total}] {mode}: {file_name} ({export_info['file_size']:,} bytes)")
 
         return exported_files
 
-    def save_to_csv(self, exported_files: List[Dict], dry_run: bool = False):
+    def _export_file(self, file_info: MediaFile, source_path: str, dest_path: str,
+                     dry_run: bool) -> Dict:
+        """
+        Copy a single file from backup and build its export record
+
+        Args:
+            file_info: Media file information
+            source_path: Path of the file in backup directory
+            dest_path: Destination path (already free of duplicates)
+            dry_run: If True, don't actually copy the file
+
+        Returns:
+            Exported file information
+        """
+        # Size and modification time come from Manifest.db when recorded
+        file_size = file_info.file_size
+        if file_size is None:
+            file_size = os.path.getsize(source_path)
+        last_modified = file_info.last_modified
+
+        if not dry_run:
+            self._fast_copy(source_path, dest_path)
+            if last_modified is not None:
+                os.utime(dest_path, (last_modified, last_modified))
+            else:
+                shutil.copystat(source_path, dest_path)
+
+        if last_modified is None:
+            last_modified = os.path.getmtime(source_path)
+        mod_time = datetime.fromtimestamp(last_modified)
+
+        return {
+            'original_path': file_info.relative_path,
+            'file_name': file_info.file_name,
+            'file_size': file_size,
+            'modified_time': mod_time.isoformat(),
+            'export_path': dest_path,
+            'capture_date': file_info.capture_date,
+            'latitude': file_info.latitude,
+            'longitude': file_info.longitude,
+            'timezone': file_info.timezone,
+            'is_favorite': file_info.is_favorite
+        }
+
+    @staticmethod
+    def _fast_copy(source_path: str, dest_path: str):
+        """
+        Copy file data inside the kernel (metadata is not copied)
+
+        Uses os.copy_file_range on Linux, which also allows reflinks on
+        filesystems that support them. Elsewhere, or when the filesystems
+        refuse it (e.g. across devices), shutil.copyfile is used, which
+        picks sendfile/fcopyfile where available.
+
+        Args:
+            source_path: File to copy
+            dest_path: Destination file (overwritten)
+        """
+        copied = False
+        if hasattr(os, 'copy_file_range'):
+            with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+                try:
+                    # Some filesystems return 0 instead of raising, so the
+                    # copy only counts if every byte arrived (empty files
+                    # go through shutil too)
+                    size = os.fstat(src.fileno()).st_size
+                    offset = 0
+                    while sent := os.copy_file_range(src.fileno(), dst.fileno(), 1 << 30):
+                        offset += sent
+                    copied = 0 < offset == size
+                except OSError:
+                    pass
+
+        if not copied:
+            shutil.copyfile(source_path, dest_path)
+
+    def save_to_csv(self, exported_files: Iterable[Dict], dry_run: bool = False):
         """
         Save exported file information to CSV
 
+        Rows are written as they are read, so a generator can be passed
+        without building a list first. In dry run mode it is not consumed.
+
         Args:
-            exported_files: List of exported file information
+            exported_files: Exported file information (list or iterator)
             dry_run: If True, don't actually write the file
         """
         if dry_run:
             print(f"\nDRY RUN: Would save file list to: {self.csv_output}")
             return
 
-        with open(self.csv_output, 'w', newline='', encoding='utf-8') as csvfile:
+        # Large buffer so rows reach the disk in few write() calls
+        with open(self.csv_output, 'w', newline='', encoding='utf-8',
+                  buffering=1 << 20) as csvfile:
             fieldnames = ['original_path', 'file_name', 'file_size',
                          'modified_time', 'export_path', 'capture_date',
                          'latitude', 'longitude', 'timezone', 'is_favorite']
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
             writer.writeheader()
-            for file_info in exported_files:
-                writer.writerow(file_info)
+            writer.writerows(exported_files)
 
         print(f"\nFile list saved to: {self.csv_output}")
 
@@ -319,21 +661,8 @@ class BackupExtractor:
 
             # Show statistics
             stats = self.get_statistics(media_files)
-            print(f"\nStatistics:")
-            print(f"  Total files: {stats['total_count']}")
-            print(f"  Total size: {stats['total_size']:,} bytes ({stats['total_size'] / 1024 / 1024:.2f} MB)")
-            print(f"  By extension:")
-            for ext, count in sorted(stats['by_extension'].items()):
-                print(f"    {ext}: {count}")
-            if stats['missing_files'] > 0:
-                print(f"  Missing files: {stats['missing_files']}")
-
-            # Metadata statistics
-            if self.photos_reader:
-                print(f"\nMetadata statistics:")
-                print(f"  Files with capture date: {stats['with_metadata']}")
-                print(f"  Files with GPS data: {stats['with_gps']}")
-                print(f"  Favorite files: {stats['favorites']}")
+            print()
+            self.print_statistics(stats)
             print()
 
             # Step 2: Export files
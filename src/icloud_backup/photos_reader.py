@@ -5,9 +5,24 @@ Extract photo/video metadata from iTunes backup
 
 import sqlite3
 import os
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from math import isnan, nan
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from .db import open_sqlite
+
+
+# GPS invalid value (module level for the per-row loop)
+_GPS_INVALID = -180.0
+
+# Unix timestamp for the Core Data epoch 2001-01-01 00:00:00 GMT
+_CORE_DATA_EPOCH_UNIX = 978307200
+
+# SQLite's default limit on bound parameters per statement
+_SQLITE_MAX_PARAMS = 999
 
 
 class PhotosSchemaError(Exception):
@@ -15,6 +30,35 @@ class PhotosSchemaError(Exception):
     pass
 
 
+@dataclass(slots=True)
+class PhotoColumns:
+    """
+    Photos.sqlite metadata stored column-wise, one entry per asset
+
+    Coordinates are packed float arrays with NaN for missing/invalid GPS,
+    favorites a bytearray of 0/1, instead of one dict per asset.
+    """
+
+    paths: List[str] = field(default_factory=list)
+    capture_date: List[Optional[str]] = field(default_factory=list)
+    latitude: array = field(default_factory=lambda: array('d'))
+    longitude: array = field(default_factory=lambda: array('d'))
+    timezone: List[Optional[str]] = field(default_factory=list)
+    is_favorite: bytearray = field(default_factory=bytearray)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def index(self) -> Dict[str, int]:
+        """Map file path to row number"""
+        return {path: i for i, path in enumerate(self.paths)}
+
+    @staticmethod
+    def coordinate(value: float) -> Optional[float]:
+        """Convert a stored coordinate back to float or None"""
+        return None if isnan(value) else value
+
+
 class PhotosReader:
     """
     Read photo metadata from Photos.sqlite in iTunes backup
@@ -24,11 +68,10 @@ class PhotosReader:
     """
 
     # Core Data epoch: 2001-01-01 00:00:00 GMT
-    CORE_DATA_EPOCH = datetime(2001, 1, 1)
-    CORE_DATA_EPOCH_UNIX = 978307200  # Unix timestamp for 2001-01-01
+    CORE_DATA_EPOCH_UNIX = _CORE_DATA_EPOCH_UNIX  # Unix timestamp for 2001-01-01
 
     # GPS invalid values
-    GPS_INVALID = -180.0
+    GPS_INVALID = _GPS_INVALID
 
     def __init__(self, backup_dir: str):
         """
@@ -44,27 +87,79 @@ class PhotosReader:
         self.backup_dir = backup_dir
         self.manifest_db_path = os.path.join(backup_dir, "Manifest.db")
         self.photos_db_path = None
+        self._conn = None
+        self._shared = False  # Set by from_backup_dir(), see close()
 
-        if not os.path.exists(self.backup_dir):
-            raise FileNotFoundError(f"Backup directory not found: {backup_dir}")
-
-        if not os.path.exists(self.manifest_db_path):
-            raise FileNotFoundError(f"Manifest.db not found: {self.manifest_db_path}")
-
-        # Locate Photos.sqlite
+        # Locate Photos.sqlite (also reports a missing backup directory
+        # or Manifest.db, no separate existence checks needed)
         self._locate_photos_db()
 
+        # One connection for the lifetime of the reader (may be shared
+        # between threads through from_backup_dir())
+        try:
+            self._conn = open_sqlite(self.photos_db_path, check_same_thread=False)
+        except sqlite3.OperationalError:
+            raise FileNotFoundError(
+                f"Photos.sqlite file not found at expected location: {self.photos_db_path}"
+            )
+
         # Verify schema compatibility
-        self._verify_schema()
+        try:
+            self._verify_schema()
+        except PhotosSchemaError:
+            self.close()
+            raise
+
+    @classmethod
+    @lru_cache(maxsize=4)
+    def from_backup_dir(cls, backup_dir: str) -> 'PhotosReader':
+        """
+        Get a shared PhotosReader for a backup directory
+
+        Readers are cached per backup directory, so Photos.sqlite is opened
+        and its schema verified only once. close() (and leaving a with
+        block) does nothing on a shared reader, so one caller cannot close
+        the connection for the others.
+
+        Args:
+            backup_dir: Path to iTunes backup directory
+
+        Returns:
+            PhotosReader instance
+
+        Raises:
+            FileNotFoundError: If backup directory or Manifest.db not found
+            PhotosSchemaError: If Photos.sqlite has incompatible schema
+        """
+        reader = cls(backup_dir)
+        reader._shared = True
+        return reader
+
+    def close(self):
+        """Close the Photos.sqlite connection (no-op for shared readers)"""
+        if self._shared:
+            return
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _locate_photos_db(self):
         """
         Locate Photos.sqlite file using Manifest.db
 
         Raises:
-            FileNotFoundError: If Photos.sqlite not found
+            FileNotFoundError: If Manifest.db or Photos.sqlite not found
         """
-        conn = sqlite3.connect(self.manifest_db_path)
+        try:
+            conn = open_sqlite(self.manifest_db_path)
+        except sqlite3.OperationalError:
+            raise FileNotFoundError(f"Manifest.db not found: {self.manifest_db_path}")
         cursor = conn.cursor()
 
         # Search for Photos.sqlite in CameraRollDomain
@@ -90,11 +185,6 @@ class PhotosReader:
         subdir = file_id[:2]
         self.photos_db_path = os.path.join(self.backup_dir, subdir, file_id)
 
-        if not os.path.exists(self.photos_db_path):
-            raise FileNotFoundError(
-                f"Photos.sqlite file not found at expected location: {self.photos_db_path}"
-            )
-
     def _verify_schema(self):
         """
         Verify Photos.sqlite has expected schema
@@ -102,8 +192,7 @@ class PhotosReader:
         Raises:
             PhotosSchemaError: If schema is incompatible
         """
-        conn = sqlite3.connect(self.photos_db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
 
         # Check if ZASSET table exists
         cursor.execute(
@@ -116,25 +205,27 @@ class PhotosReader:
                 "SELECT name FROM sqlite_master WHERE type='table' AND name='ZGENERICASSET'"
             )
             if cursor.fetchone():
-                conn.close()
                 raise PhotosSchemaError(
                     "Found ZGENERICASSET table (iOS 13-14 schema). "
                     "Current implementation supports iOS 15+ (ZASSET table). "
                     "See docs/photos_reader_design.md for schema migration."
                 )
             else:
-                conn.close()
                 raise PhotosSchemaError(
                     "Neither ZASSET nor ZGENERICASSET table found. "
                     "Unknown Photos.sqlite schema. "
                     "See docs/photos_sqlite_investigation.md for investigation procedure."
                 )
 
-        conn.close()
-
-    def get_photo_metadata(self) -> Dict[str, Dict]:
+    def get_photo_metadata(self, asset_keys: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
         """
-        Extract metadata for all photos/videos
+        Extract metadata for all photos/videos, or only for the given assets
+
+        Dictionary view of get_photo_metadata_columns().
+
+        Args:
+            asset_keys: File paths to fetch ('DCIM/100APPLE/IMG_0001.HEIC'),
+                None for all assets
 
         Returns:
             Dictionary mapping file path to metadata:
@@ -151,20 +242,66 @@ class PhotosReader:
         Raises:
             PhotosSchemaError: If query fails due to schema issues
         """
-        conn = sqlite3.connect(self.photos_db_path)
-        cursor = conn.cursor()
+        columns = self.get_photo_metadata_columns(asset_keys)
+        coordinate = PhotoColumns.coordinate
+
+        return {
+            file_path: {
+                'capture_date': capture_date,
+                'latitude': coordinate(latitude),
+                'longitude': coordinate(longitude),
+                'timezone': timezone,
+                'is_favorite': bool(is_favorite)
+            }
+            for file_path, capture_date, latitude, longitude, timezone, is_favorite in zip(
+                columns.paths, columns.capture_date, columns.latitude,
+                columns.longitude, columns.timezone, columns.is_favorite
+            )
+        }
+
+    def get_photo_metadata_columns(self, asset_keys: Optional[Iterable[str]] = None) -> PhotoColumns:
+        """
+        Extract metadata for all photos/videos, or only for the given assets
+
+        A small key set is looked up with a single IN query. Beyond the
+        SQLite parameter limit one table scan is cheaper than several IN
+        queries (the path expression cannot use an index), so rows are
+        filtered in Python instead.
+
+        Args:
+            asset_keys: File paths to fetch ('DCIM/100APPLE/IMG_0001.HEIC'),
+                None for all assets
+
+        Returns:
+            PhotoColumns with one row per asset
+
+        Raises:
+            PhotosSchemaError: If query fails due to schema issues
+        """
+        cursor = self._conn.cursor()
 
         # Query for assets with additional attributes
         # Only non-trashed items (ZTRASHEDSTATE = 0)
+        # Capture date: EXIF timestamp if available (more reliable), otherwise
+        # the Core Data creation timestamp converted by SQLite. It is floored
+        # to whole seconds first: strftime would round milliseconds up, and
+        # CAST alone truncates toward zero, one second late before 1970.
+        # The three placeholders are the Core Data epoch as a Unix timestamp.
         query = """
         SELECT
             a.ZFILENAME,
             a.ZDIRECTORY,
-            a.ZDATECREATED,
+            COALESCE(
+                NULLIF(aa.ZEXIFTIMESTAMPSTRING, ''),
+                strftime('%Y-%m-%d %H:%M:%S',
+                         CAST(NULLIF(a.ZDATECREATED, 0) + ? AS INTEGER)
+                         - (NULLIF(a.ZDATECREATED, 0) + ?
+                            < CAST(NULLIF(a.ZDATECREATED, 0) + ? AS INTEGER)),
+                         'unixepoch')
+            ),
             a.ZLATITUDE,
             a.ZLONGITUDE,
             a.ZFAVORITE,
-            aa.ZEXIFTIMESTAMPSTRING,
             aa.ZTIMEZONENAME
         FROM ZASSET a
         LEFT JOIN ZADDITIONALASSETATTRIBUTES aa
@@ -172,73 +309,54 @@ class PhotosReader:
         WHERE a.ZTRASHEDSTATE = 0
             AND a.ZFILENAME IS NOT NULL
         """
+        params = [self.CORE_DATA_EPOCH_UNIX] * 3
+
+        keys = None
+        if asset_keys is not None:
+            keys = set(asset_keys)
+            if len(keys) <= _SQLITE_MAX_PARAMS - len(params):
+                placeholders = ", ".join("?" * len(keys))
+                query += f"AND a.ZDIRECTORY || '/' || a.ZFILENAME IN ({placeholders})"
+                params.extend(keys)
+                keys = None
 
         try:
-            cursor.execute(query)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
         except sqlite3.OperationalError as e:
-            conn.close()
             raise PhotosSchemaError(
                 f"Failed to query Photos.sqlite: {str(e)}. "
                 "Schema may be incompatible. "
                 "See docs/photos_reader_design.md"
             )
 
-        # Build metadata dictionary
-        metadata = {}
-
-        for row in rows:
-            filename = row[0]
-            directory = row[1]
-            date_created = row[2]
-            latitude = row[3]
-            longitude = row[4]
-            is_favorite = row[5]
-            exif_timestamp = row[6]
-            timezone = row[7]
+        # Build metadata columns
+        columns = PhotoColumns()
+        paths = columns.paths
+        capture_dates = columns.capture_date
+        latitudes = columns.latitude
+        longitudes = columns.longitude
+        timezones = columns.timezone
+        favorites = columns.is_favorite
 
+        for filename, directory, capture_date, latitude, longitude, is_favorite, timezone in rows:
             # Construct file path (matching Manifest.db format without Media/ prefix)
             if directory and filename:
                 file_path = f"{directory}/{filename}"
             else:
                 continue
+            if keys is not None and file_path not in keys:
+                continue
 
-            # Process capture date
-            capture_date = None
-            if exif_timestamp:
-                # Use EXIF timestamp if available (more reliable)
-                capture_date = exif_timestamp
-            elif date_created:
-                # Fall back to Core Data timestamp
-                capture_date = self._convert_core_data_timestamp(date_created)
-
-            # Process GPS coordinates
-            lat = None if latitude == self.GPS_INVALID else latitude
-            lon = None if longitude == self.GPS_INVALID else longitude
-
-            metadata[file_path] = {
-                'capture_date': capture_date,
-                'latitude': lat,
-                'longitude': lon,
-                'timezone': timezone,
-                'is_favorite': bool(is_favorite) if is_favorite else False
-            }
-
-        conn.close()
-        return metadata
-
-    def _convert_core_data_timestamp(self, timestamp: float) -> str:
-        """
-        Convert Core Data timestamp to ISO format string
-
-        Args:
-            timestamp: Seconds since 2001-01-01 00:00:00 GMT
+            # Missing or invalid GPS coordinates become NaN
+            paths.append(file_path)
+            capture_dates.append(capture_date)
+            latitudes.append(nan if latitude is None or latitude == _GPS_INVALID else latitude)
+            longitudes.append(nan if longitude is None or longitude == _GPS_INVALID else longitude)
+            timezones.append(timezone)
+            favorites.append(is_favorite == 1)
 
-        Returns:
-            ISO format datetime string (YYYY-MM-DD HH:MM:SS)
-        """
-        dt = self.CORE_DATA_EPOCH + timedelta(seconds=timestamp)
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
+        return columns
 
     def get_statistics(self) -> Dict:
         """
@@ -247,31 +365,27 @@ class PhotosReader:
         Returns:
             Dictionary with statistics
         """
-        conn = sqlite3.connect(self.photos_db_path)
-        cursor = conn.cursor()
-
-        stats = {}
+        cursor = self._conn.cursor()
 
-        # Total assets
-        cursor.execute("SELECT COUNT(*) FROM ZASSET WHERE ZTRASHEDSTATE = 0")
-        stats['total_assets'] = cursor.fetchone()[0]
-
-        # Assets with GPS
+        # All counts in a single scan of ZASSET
         cursor.execute(
-            f"SELECT COUNT(*) FROM ZASSET "
-            f"WHERE ZTRASHEDSTATE = 0 AND ZLATITUDE != {self.GPS_INVALID}"
+            """
+            SELECT
+                COUNT(CASE WHEN ZTRASHEDSTATE = 0 THEN 1 END),
+                COUNT(CASE WHEN ZTRASHEDSTATE = 0 AND ZLATITUDE != ? THEN 1 END),
+                COUNT(CASE WHEN ZTRASHEDSTATE = 0 AND ZFAVORITE = 1 THEN 1 END),
+                COUNT(CASE WHEN ZTRASHEDSTATE != 0 THEN 1 END)
+            FROM ZASSET
+            """,
+            (self.GPS_INVALID,)
         )
-        stats['assets_with_gps'] = cursor.fetchone()[0]
+        total_assets, assets_with_gps, favorite_assets, trashed_assets = cursor.fetchone()
 
-        # Favorite assets
-        cursor.execute(
-            "SELECT COUNT(*) FROM ZASSET WHERE ZTRASHEDSTATE = 0 AND ZFAVORITE = 1"
-        )
-        stats['favorite_assets'] = cursor.fetchone()[0]
+        stats = {
+            'total_assets': total_assets,
+            'assets_with_gps': assets_with_gps,
+            'favorite_assets': favorite_assets,
+            'trashed_assets': trashed_assets
+        }
 
-        # Trashed assets
-        cursor.execute("SELECT COUNT(*) FROM ZASSET WHERE ZTRASHEDSTATE != 0")
-        stats['trashed_assets'] = cursor.fetchone()[0]
-
-        conn.close()
         return stats
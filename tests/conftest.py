@@ -0,0 +1,61 @@
+"""
+Shared fixtures for BackupExtractor and PhotosReader tests
+
+Config, extractor and the Manifest.db listing are built once per session,
+so the backup databases are opened and scanned only once.
+"""
+
+import pytest
+
+from icloud_backup.config import Config
+from icloud_backup.extractor import BackupExtractor
+from icloud_backup.photos_reader import PhotosReader, PhotosSchemaError
+
+
+@pytest.fixture(scope="session")
+def config():
+    """Create config from environment"""
+    return Config()
+
+
+@pytest.fixture(scope="session")
+def require_valid_config(config):
+    """
+    Validated config, checked once per session
+
+    Tests and fixtures that need a real backup request this; without a
+    valid configuration (e.g., no .env file) they are all skipped.
+    """
+    is_valid, error_msg = config.validate()
+    if not is_valid:
+        pytest.skip(f"Configuration not valid: {error_msg}")
+    return config
+
+
+@pytest.fixture(scope="session")
+def extractor(require_valid_config):
+    """Create extractor instance"""
+    return BackupExtractor(require_valid_config)
+
+
+@pytest.fixture(scope="session")
+def media_files(extractor):
+    """Media files from Manifest.db, read once per session"""
+    return extractor.get_media_files_from_manifest()
+
+
+@pytest.fixture(scope="session")
+def reader(require_valid_config):
+    """Shared PhotosReader, skipped once if Photos.sqlite is not usable"""
+    try:
+        return PhotosReader.from_backup_dir(require_valid_config.backup_dir)
+    except FileNotFoundError as e:
+        pytest.skip(f"Photos.sqlite not found: {e}")
+    except PhotosSchemaError as e:
+        pytest.skip(f"Photos.sqlite schema incompatible: {e}")
+
+
+@pytest.fixture(scope="session")
+def export_tmp(tmp_path_factory):
+    """Scratch directory for output paths, shared by dry-run tests"""
+    return tmp_path_factory.mktemp("export")
@@ -2,17 +2,21 @@
 Tests for BackupExtractor and PhotosReader
 """
 
+import logging
+import os
+import plistlib
+import sqlite3
 import pytest
-import sys
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from icloud_backup.config import Config
-from icloud_backup.extractor import BackupExtractor
+from icloud_backup.extractor import BackupExtractor, MediaFile
 from icloud_backup.photos_reader import PhotosReader, PhotosSchemaError
 
+# Diagnostics only, shown with --log-cli-level=DEBUG
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = frozenset(['capture_date', 'latitude', 'longitude', 'timezone', 'is_favorite'])
+
 
 class TestConfig:
     """Test configuration management"""
@@ -38,165 +42,191 @@ class TestConfig:
         assert "not found" in error_msg
 
 
-class TestPhotosReader:
-    """Test PhotosReader with real data"""
+class TestHelpers:
+    """Test helpers that need no real backup"""
+
+    @pytest.mark.parametrize("file_name, file_ext", [
+        ('IMG_0001.HEIC', '.heic'),
+        ('a.b.JPG', '.jpg'),
+        ('.heic', ''),
+        ('..JPG', ''),
+        ('.x.JPG', '.jpg'),
+    ])
+    def test_build_file_info_extension(self, file_name, file_ext):
+        """Extensions follow os.path.splitext, leading dots belong to the name"""
+        relative_path = f"Media/DCIM/100APPLE/{file_name}"
+        media_file = BackupExtractor._build_file_info('ab' * 20, 'CameraRollDomain',
+                                                      relative_path, None)
+
+        assert media_file.file_name == file_name
+        assert media_file.file_ext == file_ext
+        assert media_file.file_size is None
+
+    def test_decode_file_blob(self):
+        """MBFile properties are read from the NSKeyedArchiver blob"""
+        blob = plistlib.dumps({
+            '$archiver': 'NSKeyedArchiver',
+            '$version': 100000,
+            '$top': {'root': plistlib.UID(1)},
+            '$objects': ['$null', {'Size': 1000, 'LastModified': 1700000000}],
+        }, fmt=plistlib.FMT_BINARY)
+
+        properties = BackupExtractor._decode_file_blob(blob)
+        assert properties['Size'] == 1000
+        assert properties['LastModified'] == 1700000000
+
+    @pytest.mark.parametrize("blob", [None, b'', b'not a plist',
+                                      plistlib.dumps({'$objects': []})])
+    def test_decode_file_blob_invalid(self, blob):
+        """Undecodable blobs give an empty dict"""
+        assert BackupExtractor._decode_file_blob(blob) == {}
+
+    @pytest.mark.parametrize("data", [b'', b'x', os.urandom(1 << 16)])
+    def test_fast_copy(self, tmp_path, data):
+        """Copies are byte-identical, including empty files"""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        source.write_bytes(data)
+
+        BackupExtractor._fast_copy(os.fspath(source), os.fspath(dest))
+        assert dest.read_bytes() == data
+
+    def test_fast_copy_short(self, tmp_path, monkeypatch):
+        """A copy_file_range that copies nothing falls back to shutil"""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        source.write_bytes(b'x' * 1000)
+
+        monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+        BackupExtractor._fast_copy(os.fspath(source), os.fspath(dest))
+        assert dest.read_bytes() == b'x' * 1000
+
+    def test_shared_reader_not_closed(self, tmp_path):
+        """Leaving a with block keeps a shared PhotosReader usable"""
+        file_id = '12' * 20
+        os.mkdir(tmp_path / file_id[:2])
+        conn = sqlite3.connect(tmp_path / file_id[:2] / file_id)
+        conn.executescript("""
+            CREATE TABLE ZASSET (ZTRASHEDSTATE, ZLATITUDE, ZFAVORITE);
+            INSERT INTO ZASSET VALUES (0, -180.0, 1);
+        """)
+        conn.close()
+        conn = sqlite3.connect(tmp_path / "Manifest.db")
+        conn.execute("CREATE TABLE Files (fileID, domain, relativePath, flags, file)")
+        conn.execute("INSERT INTO Files VALUES (?, 'CameraRollDomain', "
+                     "'Media/PhotoData/Photos.sqlite', 1, NULL)", (file_id,))
+        conn.commit()
+        conn.close()
+
+        backup_dir = os.fspath(tmp_path)
+        with PhotosReader.from_backup_dir(backup_dir) as reader:
+            assert reader.get_statistics()['favorite_assets'] == 1
+
+        assert PhotosReader.from_backup_dir(backup_dir).get_statistics()['total_assets'] == 1
+
+
+def check_initialization(reader):
+    """PhotosReader located Photos.sqlite"""
+    assert reader.photos_db_path is not None
+    assert os.path.lexists(reader.photos_db_path)
+
+
+def check_metadata(reader):
+    """Metadata extraction from Photos.sqlite"""
+    metadata = reader.get_photo_metadata()
+
+    # Should return a dictionary
+    assert isinstance(metadata, dict)
+
+    # If there's data, check structure
+    if metadata:
+        # Get first entry
+        first_path = next(iter(metadata))
+        first_entry = metadata[first_path]
+
+        # Check required fields
+        assert METADATA_FIELDS.issubset(first_entry)
+
+        logger.debug("Sample metadata for %s:", first_path)
+        logger.debug("  Capture date: %s", first_entry['capture_date'])
+        logger.debug("  GPS: %s, %s", first_entry['latitude'], first_entry['longitude'])
+        logger.debug("  Timezone: %s", first_entry['timezone'])
+        logger.debug("  Favorite: %s", first_entry['is_favorite'])
+
+
+def check_statistics(reader):
+    """Statistics calculation"""
+    stats = reader.get_statistics()
+
+    # Check statistics structure
+    assert {'total_assets', 'assets_with_gps', 'favorite_assets', 'trashed_assets'}.issubset(stats)
+
+    logger.debug("Photos.sqlite statistics:")
+    logger.debug("  Total assets: %s", stats['total_assets'])
+    logger.debug("  With GPS: %s", stats['assets_with_gps'])
+    logger.debug("  Favorites: %s", stats['favorite_assets'])
+    logger.debug("  Trashed: %s", stats['trashed_assets'])
 
-    @pytest.fixture
-    def config(self):
-        """Create config from environment"""
-        return Config()
 
-    def test_photos_reader_initialization(self, config):
-        """Test PhotosReader can be initialized"""
-        is_valid, _ = config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid - likely missing .env file")
+class TestPhotosReader:
+    """Test PhotosReader with real data"""
 
+    @pytest.mark.parametrize(
+        "check",
+        [check_initialization, check_metadata, check_statistics],
+        ids=["initialization", "get_metadata", "statistics"]
+    )
+    def test_photos_reader(self, reader, check):
+        """Run each check against the shared reader"""
         try:
-            reader = PhotosReader(config.backup_dir)
-            assert reader.photos_db_path is not None
-            assert Path(reader.photos_db_path).exists()
-        except FileNotFoundError as e:
-            pytest.skip(f"Photos.sqlite not found: {e}")
+            check(reader)
         except PhotosSchemaError as e:
-            pytest.skip(f"Photos.sqlite schema incompatible: {e}")
-
-    def test_photos_reader_get_metadata(self, config):
-        """Test metadata extraction from Photos.sqlite"""
-        is_valid, _ = config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid")
-
-        try:
-            reader = PhotosReader(config.backup_dir)
-            metadata = reader.get_photo_metadata()
-
-            # Should return a dictionary
-            assert isinstance(metadata, dict)
-
-            # If there's data, check structure
-            if metadata:
-                # Get first entry
-                first_path = list(metadata.keys())[0]
-                first_entry = metadata[first_path]
-
-                # Check required fields
-                assert 'capture_date' in first_entry
-                assert 'latitude' in first_entry
-                assert 'longitude' in first_entry
-                assert 'timezone' in first_entry
-                assert 'is_favorite' in first_entry
-
-                print(f"Sample metadata for {first_path}:")
-                print(f"  Capture date: {first_entry['capture_date']}")
-                print(f"  GPS: {first_entry['latitude']}, {first_entry['longitude']}")
-                print(f"  Timezone: {first_entry['timezone']}")
-                print(f"  Favorite: {first_entry['is_favorite']}")
-
-        except (FileNotFoundError, PhotosSchemaError) as e:
-            pytest.skip(f"Photos.sqlite not available: {e}")
-
-    def test_photos_reader_statistics(self, config):
-        """Test statistics calculation"""
-        is_valid, _ = config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid")
-
-        try:
-            reader = PhotosReader(config.backup_dir)
-            stats = reader.get_statistics()
-
-            # Check statistics structure
-            assert 'total_assets' in stats
-            assert 'assets_with_gps' in stats
-            assert 'favorite_assets' in stats
-            assert 'trashed_assets' in stats
-
-            print(f"Photos.sqlite statistics:")
-            print(f"  Total assets: {stats['total_assets']}")
-            print(f"  With GPS: {stats['assets_with_gps']}")
-            print(f"  Favorites: {stats['favorite_assets']}")
-            print(f"  Trashed: {stats['trashed_assets']}")
-
-        except (FileNotFoundError, PhotosSchemaError) as e:
             pytest.skip(f"Photos.sqlite not available: {e}")
 
 
 class TestBackupExtractor:
     """Test BackupExtractor with real data"""
 
-    @pytest.fixture
-    def config(self):
-        """Create config from environment"""
-        return Config()
-
-    @pytest.fixture
-    def extractor(self, config):
-        """Create extractor instance"""
-        return BackupExtractor(config)
-
     def test_manifest_db_exists(self, extractor):
         """Test that Manifest.db can be accessed"""
         manifest_path = extractor.get_manifest_db_path()
-        assert Path(manifest_path).exists(), f"Manifest.db not found at {manifest_path}"
+        assert os.path.lexists(manifest_path), f"Manifest.db not found at {manifest_path}"
 
-    def test_get_media_files_from_manifest(self, extractor):
+    def test_get_media_files_from_manifest(self, extractor, media_files):
         """Test reading media files from Manifest.db"""
-        # Skip if config is not valid (e.g., running without proper .env)
-        is_valid, _ = extractor.config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid - likely missing .env file")
-
-        media_files = extractor.get_media_files_from_manifest()
-
         # Should return a list
         assert isinstance(media_files, list)
 
         # If there are files, check structure
         if media_files:
             first_file = media_files[0]
-            assert 'file_id' in first_file
-            assert 'file_name' in first_file
-            assert 'relative_path' in first_file
-            assert 'file_ext' in first_file
-
-            # New metadata fields should be present
-            assert 'capture_date' in first_file
-            assert 'latitude' in first_file
-            assert 'longitude' in first_file
-            assert 'timezone' in first_file
-            assert 'is_favorite' in first_file
-
-            # File extension should be in media extensions
-            assert first_file['file_ext'] in extractor.media_extensions
-
-            print(f"Sample file with metadata:")
-            print(f"  Filename: {first_file['file_name']}")
-            print(f"  Capture date: {first_file.get('capture_date', 'N/A')}")
-            print(f"  Has GPS: {'Yes' if first_file.get('latitude') else 'No'}")
-
-    def test_get_statistics(self, extractor):
-        """Test statistics calculation with metadata"""
-        # Skip if config is not valid
-        is_valid, _ = extractor.config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid - likely missing .env file")
+            assert isinstance(first_file, MediaFile)
+
+            # Manifest fields should be consistent with each other
+            assert len(first_file.file_id) == 40
+            assert first_file.relative_path.startswith('Media/DCIM/')
+            assert first_file.file_name == first_file.relative_path.rpartition('/')[2]
+            assert first_file.file_name.lower().endswith(first_file.file_ext)
 
-        media_files = extractor.get_media_files_from_manifest()
+            # File extension should be in media extensions (filtered in the
+            # Manifest.db query, before any Photos.sqlite lookup)
+            assert {f.file_ext for f in media_files}.issubset(extractor.media_extensions)
 
+            logger.debug("Sample file with metadata:")
+            logger.debug("  Filename: %s", first_file.file_name)
+            logger.debug("  Capture date: %s", first_file.capture_date or 'N/A')
+            logger.debug("  Has GPS: %s", 'Yes' if first_file.latitude else 'No')
+
+    def test_get_statistics(self, extractor, media_files):
+        """Test statistics calculation with metadata"""
         if not media_files:
             pytest.skip("No media files found in backup")
 
         stats = extractor.get_statistics(media_files)
 
         # Check statistics structure
-        assert 'total_count' in stats
-        assert 'by_extension' in stats
-        assert 'total_size' in stats
-        assert 'missing_files' in stats
-        assert 'with_metadata' in stats
-        assert 'with_gps' in stats
-        assert 'favorites' in stats
+        assert {'total_count', 'by_extension', 'total_size', 'missing_files',
+                'with_metadata', 'with_gps', 'favorites'}.issubset(stats)
 
         # Total count should match
         assert stats['total_count'] == len(media_files)
@@ -205,23 +235,19 @@ class TestBackupExtractor:
         if stats['missing_files'] < stats['total_count']:
             assert stats['total_size'] > 0
 
-        print(f"Enhanced statistics:")
-        print(f"  Total files: {stats['total_count']}")
-        print(f"  With metadata: {stats['with_metadata']}")
-        print(f"  With GPS: {stats['with_gps']}")
-        print(f"  Favorites: {stats['favorites']}")
+        logger.debug("Enhanced statistics:")
+        logger.debug("  Total files: %s", stats['total_count'])
+        logger.debug("  With metadata: %s", stats['with_metadata'])
+        logger.debug("  With GPS: %s", stats['with_gps'])
+        logger.debug("  Favorites: %s", stats['favorites'])
 
-    def test_dry_run_mode(self, extractor, tmp_path):
+    def test_dry_run_mode(self, extractor, export_tmp, monkeypatch):
         """Test dry run mode (no actual file copying)"""
-        # Skip if config is not valid
-        is_valid, _ = extractor.config.validate()
-        if not is_valid:
-            pytest.skip("Configuration not valid - likely missing .env file")
+        # Override export dir to tmp (restored for the shared extractor)
+        monkeypatch.setattr(extractor, "export_dir", os.fspath(export_tmp / "export"))
 
-        # Override export dir to tmp
-        extractor.export_dir = str(tmp_path / "export")
-
-        media_files = extractor.get_media_files_from_manifest()
+        # Only the files to export are read
+        media_files = extractor.get_media_files_from_manifest(limit=5)
 
         if not media_files:
             pytest.skip("No media files found in backup")
@@ -234,30 +260,22 @@ class TestBackupExtractor:
         assert len(exported) <= 5
 
         # Each exported file should have metadata fields
-        if exported:
-            first_export = exported[0]
-            assert 'capture_date' in first_export
-            assert 'latitude' in first_export
-            assert 'longitude' in first_export
+        assert all(METADATA_FIELDS.issubset(row) for row in exported)
 
         # But should not create export directory
-        assert not Path(extractor.export_dir).exists()
+        assert not os.path.lexists(extractor.export_dir)
 
 
 class TestIntegration:
     """Integration tests with full workflow"""
 
-    def test_full_dry_run_workflow(self, tmp_path):
+    def test_full_dry_run_workflow(self, require_valid_config, export_tmp, monkeypatch):
         """Test complete dry run workflow with metadata"""
-        config = Config()
-        is_valid, error_msg = config.validate()
-
-        if not is_valid:
-            pytest.skip(f"Configuration not valid: {error_msg}")
+        config = require_valid_config
 
-        # Override output paths
-        config.export_dir = str(tmp_path / "export")
-        config.csv_output = str(tmp_path / "files.csv")
+        # Override output paths (restored for the shared config)
+        monkeypatch.setattr(config, "export_dir", os.fspath(export_tmp / "export"))
+        monkeypatch.setattr(config, "csv_output", os.fspath(export_tmp / "files.csv"))
 
         extractor = BackupExtractor(config)
 
@@ -265,32 +283,23 @@ class TestIntegration:
         extractor.run(dry_run=True, limit=10, verbose=False)
 
         # In dry run mode, files should not be created
-        assert not Path(config.export_dir).exists()
-        assert not Path(config.csv_output).exists()
+        assert not os.path.lexists(config.export_dir)
+        assert not os.path.lexists(config.csv_output)
 
-    def test_metadata_integration(self):
+    def test_metadata_integration(self, media_files, extractor):
         """Test that Manifest.db and Photos.sqlite data are properly merged"""
-        config = Config()
-        is_valid, error_msg = config.validate()
-
-        if not is_valid:
-            pytest.skip(f"Configuration not valid: {error_msg}")
-
-        extractor = BackupExtractor(config)
-        media_files = extractor.get_media_files_from_manifest()
-
         if not media_files:
             pytest.skip("No media files found")
 
         # Check that at least some files have metadata
-        files_with_metadata = [f for f in media_files if f.get('capture_date')]
+        files_with_metadata = [f for f in media_files if f.capture_date]
 
         if extractor.photos_reader:
             # If Photos.sqlite was loaded, we should have some metadata
-            print(f"Metadata coverage: {len(files_with_metadata)}/{len(media_files)} files")
+            logger.debug("Metadata coverage: %d/%d files", len(files_with_metadata), len(media_files))
             assert len(files_with_metadata) > 0, "Photos.sqlite loaded but no metadata found"
         else:
-            print("Photos.sqlite not available, skipping metadata verification")
+            logger.debug("Photos.sqlite not available, skipping metadata verification")
 
 
 # Run tests with: uv run pytest tests/test_extractor.py -v